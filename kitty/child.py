@@ -5,8 +5,9 @@
 import sys
 from collections import defaultdict
 from contextlib import contextmanager, suppress
+from time import monotonic
 from typing import (
-    TYPE_CHECKING, DefaultDict, Dict, Generator, List, Optional, Sequence,
+    TYPE_CHECKING, Any, DefaultDict, Dict, Generator, List, Optional, Sequence,
     Tuple
 )
 
@@ -30,29 +31,41 @@
 if is_macos:
     from kitty.fast_data_types import (
         cmdline_of_process as cmdline_, cwd_of_process as _cwd,
-        environ_of_process as _environ_of_process,
-        process_group_map as _process_group_map
+        environ_of_process as _environ_of_process
     )
 
-    def cwd_of_process(pid: int) -> str:
+    def _cwd_of_process(pid: int) -> str:
         return os.path.realpath(_cwd(pid))
 
-    def process_group_map() -> DefaultDict[int, List[int]]:
-        ans: DefaultDict[int, List[int]] = defaultdict(list)
-        for pid, pgid in _process_group_map():
-            ans[pgid].append(pid)
-        return ans
-
     def cmdline_of_pid(pid: int) -> List[str]:
         return cmdline_(pid)
+
+    def environ_of_process(pid: int) -> Dict[str, str]:
+        return parse_environ_block(_environ_of_process(pid))
 else:
 
+    def _slurp_proc(path: str, size: int = 8192) -> bytes:
+        # procfs files are generated by the kernel on read, so read them in as
+        # few syscalls as possible, without the overhead of a python file object.
+        # A short read means EOF.
+        fd = os.open(path, os.O_RDONLY | os.O_CLOEXEC)
+        try:
+            ans = os.read(fd, size)
+            if len(ans) < size:
+                return ans
+            chunks = [ans]
+            while len(ans) == size:
+                ans = os.read(fd, size)
+                chunks.append(ans)
+            return b''.join(chunks)
+        finally:
+            os.close(fd)
+
     def cmdline_of_pid(pid: int) -> List[str]:
-        with open(f'/proc/{pid}/cmdline', 'rb') as f:
-            return list(filter(None, f.read().decode('utf-8').split('\0')))
+        return fast_data_types.cmdline_split(_slurp_proc(f'/proc/{pid}/cmdline'))
 
     if is_freebsd:
-        def cwd_of_process(pid: int) -> str:
+        def _cwd_of_process(pid: int) -> str:
             import subprocess
             cp = subprocess.run(['pwdx', str(pid)], capture_output=True)
             if cp.returncode != 0:
@@ -60,60 +73,86 @@ def cwd_of_process(pid: int) -> str:
             ans = cp.stdout.decode('utf-8', 'replace').split()[1]
             return os.path.realpath(ans)
     else:
-        def cwd_of_process(pid: int) -> str:
-            ans = f'/proc/{pid}/cwd'
-            return os.path.realpath(ans)
+        def _cwd_of_process(pid: int) -> str:
+            # /proc/pid/cwd is a symlink to the already resolved path
+            return os.readlink(f'/proc/{pid}/cwd')
 
-    def _environ_of_process(pid: int) -> str:
-        with open(f'/proc/{pid}/environ', 'rb') as f:
-            return f.read().decode('utf-8')
+    def environ_of_process(pid: int) -> Dict[str, str]:
+        return fast_data_types.parse_environ_block(_slurp_proc(f'/proc/{pid}/environ'))
 
-    def process_group_map() -> DefaultDict[int, List[int]]:
-        ans: DefaultDict[int, List[int]] = defaultdict(list)
-        for x in os.listdir('/proc'):
-            try:
-                pid = int(x)
-            except Exception:
-                continue
-            try:
-                with open(f'/proc/{x}/stat', 'rb') as f:
-                    raw = f.read().decode('utf-8')
-            except OSError:
-                continue
-            try:
-                q = int(raw.split(' ', 5)[4])
-            except Exception:
-                continue
-            ans[q].append(pid)
-        return ans
+
+def cwd_of_process(pid: int) -> str:
+    if _cached_cwds is None:
+        return _cwd_of_process(pid)
+    ans = _cached_cwds.get(pid)
+    if ans is None:
+        ans = _cached_cwds[pid] = _cwd_of_process(pid)
+    return ans
+
+
+def process_group_map() -> DefaultDict[int, List[int]]:
+    ans: DefaultDict[int, List[int]] = defaultdict(list)
+    for pid, pgid in fast_data_types.process_group_map():
+        ans[pgid].append(pid)
+    return ans
+
+
+_TERMINFO_DIR = terminfo_dir if os.path.isdir(terminfo_dir) else None
 
 
 @run_once
-def checked_terminfo_dir() -> Optional[str]:
-    return terminfo_dir if os.path.isdir(terminfo_dir) else None
+def getpid() -> str:
+    # must not be evaluated at import time as kitty may fork when detaching
+    return str(os.getpid())
+
+
+# scanning all processes is expensive, so re-use the last scan for a short
+# time, as callers typically query several process properties in quick succession.
+# This means that processes joining or leaving an existing group are not seen
+# for up to PROCESS_GROUP_MAP_TTL seconds, only a missing group causes a rescan.
+PROCESS_GROUP_MAP_TTL = 0.1
+_cached_gmap: Optional[Tuple[float, DefaultDict[int, List[int]]]] = None
+# set while inside cached_process_data()
+_cached_map: Optional[DefaultDict[int, List[int]]] = None
+_cached_cwds: Optional[Dict[int, str]] = None
+
+
+def invalidate_process_group_map() -> None:
+    global _cached_gmap
+    _cached_gmap = None
 
 
 def processes_in_group(grp: int) -> List[int]:
-    gmap: Optional[DefaultDict[int, List[int]]] = getattr(process_group_map, 'cached_map', None)
+    global _cached_gmap
+    gmap = _cached_map
     if gmap is None:
-        try:
-            gmap = process_group_map()
-        except Exception:
-            gmap = defaultdict(list)
+        now = monotonic()
+        # a group missing from the cached map may have been created since the
+        # scan, for example by a command just started in the shell, so rescan
+        if _cached_gmap is not None and now - _cached_gmap[0] < PROCESS_GROUP_MAP_TTL and grp in _cached_gmap[1]:
+            gmap = _cached_gmap[1]
+        else:
+            try:
+                gmap = process_group_map()
+            except Exception:
+                gmap = defaultdict(list)
+            _cached_gmap = now, gmap
     return gmap.get(grp, [])
 
 
 @contextmanager
 def cached_process_data() -> Generator[None, None, None]:
+    global _cached_map, _cached_cwds
     try:
         cm = process_group_map()
     except Exception:
         cm = defaultdict(list)
-    setattr(process_group_map, 'cached_map', cm)
+    _cached_map = cm
+    _cached_cwds = {}
     try:
         yield
     finally:
-        delattr(process_group_map, 'cached_map')
+        _cached_map = _cached_cwds = None
 
 
 def parse_environ_block(data: str) -> Dict[str, str]:
@@ -121,28 +160,20 @@ def parse_environ_block(data: str) -> Dict[str, str]:
     # The block is usually raw data from the target process.  It might contain
     # trailing garbage and lines that do not look like assignments.
     ret: Dict[str, str] = {}
-    pos = 0
-
-    while True:
-        next_pos = data.find("\0", pos)
-        # nul byte at the beginning or double nul byte means finish
-        if next_pos <= pos:
+    entries = data.split('\0')
+    # the last entry is either empty or not nul terminated
+    del entries[-1]
+    for entry in entries:
+        # double nul byte means finish
+        if not entry:
             break
+        key, sep, value = entry.partition('=')
         # there might not be an equals sign
-        equal_pos = data.find("=", pos, next_pos)
-        if equal_pos > pos:
-            key = data[pos:equal_pos]
-            value = data[equal_pos + 1:next_pos]
+        if key and sep:
             ret[key] = value
-        pos = next_pos + 1
-
     return ret
 
 
-def environ_of_process(pid: int) -> Dict[str, str]:
-    return parse_environ_block(_environ_of_process(pid))
-
-
 def process_env() -> Dict[str, str]:
     ans = dict(os.environ)
     ssl_env_var = getattr(sys, 'kitty_ssl_env_var', None)
@@ -160,7 +191,7 @@ def default_env() -> Dict[str, str]:
 
 
 def set_default_env(val: Optional[Dict[str, str]] = None) -> None:
-    env = process_env().copy()
+    env = process_env()
     has_lctype = False
     if val:
         has_lctype = 'LC_CTYPE' in val
@@ -177,17 +208,66 @@ def openpty() -> Tuple[int, int]:
     return master, slave
 
 
-@run_once
-def getpid() -> str:
-    return str(os.getpid())
-
-
-class ProcessDesc(TypedDict):
+class ProcessDescDict(TypedDict):
     cwd: Optional[str]
     pid: int
     cmdline: Optional[Sequence[str]]
 
 
+class ProcessDesc:
+
+    """A foreground process whose cwd and cmdline are read only when first accessed."""
+
+    __slots__ = ('pid', 'child', '_cwd', '_cmdline', '_cwd_read', '_cmdline_read')
+
+    def __init__(self, pid: int, child: 'Child'):
+        self.pid = pid
+        self.child = child
+        self._cwd: Optional[str] = None
+        self._cmdline: Optional[Sequence[str]] = None
+        self._cwd_read = self._cmdline_read = False
+
+    @property
+    def cwd(self) -> Optional[str]:
+        if not self._cwd_read:
+            self._cwd_read = True
+            with suppress(Exception):
+                self._cwd = cwd_of_process(self.pid) or None
+        return self._cwd
+
+    @property
+    def cmdline(self) -> Optional[Sequence[str]]:
+        if not self._cmdline_read:
+            self._cmdline_read = True
+            with suppress(Exception):
+                self._cmdline = self.child.cmdline_of_pid(self.pid)
+        return self._cmdline
+
+    def __getitem__(self, key: str) -> Any:
+        # for backwards compatibility with code that treats this as a dict
+        if key in ('pid', 'cwd', 'cmdline'):
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def as_dict(self) -> ProcessDescDict:
+        return {'pid': self.pid, 'cmdline': self.cmdline, 'cwd': self.cwd}
+
+    def __repr__(self) -> str:
+        # only show values that have already been read, to avoid reading /proc
+        fields = [f'pid={self.pid}']
+        if self._cmdline_read:
+            fields.append(f'cmdline={self._cmdline!r}')
+        if self._cwd_read:
+            fields.append(f'cwd={self._cwd!r}')
+        return f'ProcessDesc({", ".join(fields)})'
+
+
 def is_prewarmable(argv: Sequence[str]) -> bool:
     if len(argv) < 3 or os.path.basename(argv[0]) != 'kitty':
         return False
@@ -228,26 +308,33 @@ def __init__(
     ):
         self.allow_remote_control = allow_remote_control
         self.is_clone_launch = is_clone_launch
-        self.argv = list(argv)
+        argv_list = list(argv)
         if cwd_from:
             try:
-                cwd = cwd_from.modify_argv_for_launch_with_cwd(self.argv) or cwd
+                cwd = cwd_from.modify_argv_for_launch_with_cwd(argv_list) or cwd
             except Exception as err:
                 log_error(f'Failed to read cwd of {cwd_from} with error: {err}')
         else:
-            cwd = os.path.expandvars(os.path.expanduser(cwd or os.getcwd()))
+            cwd = cwd or os.getcwd()
+            # the common case is an absolute path that needs no expansion
+            if cwd[0] == '~' or '$' in cwd:
+                cwd = os.path.expandvars(os.path.expanduser(cwd))
         self.cwd = os.path.abspath(cwd)
+        self.argv: Tuple[str, ...] = tuple(argv_list)
+        self.unmodified_argv = self.argv
+        self.is_prewarmable = is_prewarmable(self.argv)
         self.stdin = stdin
         self.env = env or {}
 
     def final_env(self) -> Dict[str, str]:
         from kitty.options.utils import DELETE_ENV_VAR
+        opts = fast_data_types.get_options()
         env = default_env().copy()
         if is_macos and env.get('LC_CTYPE') == 'UTF-8' and not getattr(sys, 'kitty_run_data').get(
                 'lc_ctype_before_python') and not getattr(default_env, 'lc_ctype_set_by_user', False):
             del env['LC_CTYPE']
         env.update(self.env)
-        env['TERM'] = fast_data_types.get_options().term
+        env['TERM'] = opts.term
         env['COLORTERM'] = 'truecolor'
         env['KITTY_PID'] = getpid()
         if not self.is_prewarmed:
@@ -258,16 +345,18 @@ def final_env(self) -> Dict[str, str]:
             # can use it to display the current directory name rather
             # than the resolved path
             env['PWD'] = self.cwd
-        tdir = checked_terminfo_dir()
-        if tdir:
-            env['TERMINFO'] = tdir
+        if _TERMINFO_DIR:
+            env['TERMINFO'] = _TERMINFO_DIR
         env['KITTY_INSTALLATION_DIR'] = kitty_base_dir
-        opts = fast_data_types.get_options()
-        self.unmodified_argv = list(self.argv)
         if 'disabled' not in opts.shell_integration:
             from .shell_integration import modify_shell_environ
-            modify_shell_environ(opts, env, self.argv)
-        env = {k: v for k, v in env.items() if v is not DELETE_ENV_VAR}
+            argv = list(self.argv)
+            modify_shell_environ(opts, env, argv)
+            # only bash integration changes argv
+            if len(argv) != len(self.argv) or any(a is not b for a, b in zip(argv, self.argv)):
+                self.argv = tuple(argv)
+        if any(v is DELETE_ENV_VAR for v in env.values()):
+            env = {k: v for k, v in env.items() if v is not DELETE_ENV_VAR}
         if self.is_clone_launch:
             env['KITTY_IS_CLONE_LAUNCH'] = self.is_clone_launch
             self.is_clone_launch = '1'  # free memory
@@ -281,7 +370,7 @@ def fork(self) -> Optional[int]:
         self.forked = True
         master, slave = openpty()
         stdin, self.stdin = self.stdin, None
-        self.is_prewarmed = is_prewarmable(self.argv)
+        self.is_prewarmed = self.is_prewarmable
         if not self.is_prewarmed:
             ready_read_fd, ready_write_fd = os.pipe()
             os.set_inheritable(ready_write_fd, False)
@@ -293,7 +382,7 @@ def fork(self) -> Optional[int]:
             else:
                 stdin_read_fd = stdin_write_fd = -1
             env = tuple(f'{k}={v}' for k, v in self.final_env().items())
-        argv = list(self.argv)
+        argv = self.argv
         exe = argv[0]
         if is_macos and exe == shell_path:
             # bash will only source ~/.bash_profile if it detects it is a login
@@ -310,7 +399,7 @@ def fork(self) -> Optional[int]:
             # https://github.com/kovidgoyal/kitty/issues/1870
             # xterm, urxvt, konsole and gnome-terminal do not do it in my
             # testing.
-            argv[0] = (f'-{exe.split("/")[-1]}')
+            argv = (f'-{exe.split("/")[-1]}',) + argv[1:]
         self.final_exe = which(exe) or exe
         self.final_argv0 = argv[0]
         if self.is_prewarmed:
@@ -319,9 +408,10 @@ def fork(self) -> Optional[int]:
             pid = self.prewarmed_child.child_process_pid
         else:
             pid = fast_data_types.spawn(
-                self.final_exe, self.cwd, tuple(argv), env, master, slave, stdin_read_fd, stdin_write_fd,
+                self.final_exe, self.cwd, argv, env, master, slave, stdin_read_fd, stdin_write_fd,
                 ready_read_fd, ready_write_fd, tuple(handled_signals))
         os.close(slave)
+        invalidate_process_group_map()
         self.pid = pid
         self.child_fd = master
         if not self.is_prewarmed:
@@ -348,6 +438,10 @@ def mark_terminal_ready(self) -> None:
             self.terminal_ready_fd = -1
 
     def cmdline_of_pid(self, pid: int) -> List[str]:
+        # the cmdline must be read even for our own prewarmed child, as it may
+        # have done an exec, for example, the ssh kitten execs ssh. Note that
+        # the mtime of /proc/pid/cmdline does not change on exec so it cannot
+        # be used to cache the result either.
         try:
             ans = cmdline_of_pid(pid)
         except Exception:
@@ -363,16 +457,7 @@ def foreground_processes(self) -> List[ProcessDesc]:
         try:
             pgrp = os.tcgetpgrp(self.child_fd)
             foreground_processes = processes_in_group(pgrp) if pgrp >= 0 else []
-
-            def process_desc(pid: int) -> ProcessDesc:
-                ans: ProcessDesc = {'pid': pid, 'cmdline': None, 'cwd': None}
-                with suppress(Exception):
-                    ans['cmdline'] = self.cmdline_of_pid(pid)
-                with suppress(Exception):
-                    ans['cwd'] = cwd_of_process(pid) or None
-                return ans
-
-            return [process_desc(x) for x in foreground_processes]
+            return [ProcessDesc(x, self) for x in foreground_processes]
         except Exception:
             return []
 
@@ -28,6 +28,7 @@
 #include <fcntl.h>
 #include <stdio.h>
 #include <locale.h>
+#include <dirent.h>
 
 #ifdef WITH_PROFILER
 #include <gperftools/profiler.h>
@@ -63,6 +64,45 @@ process_group_map() {
     }
     return ans;
 }
+#else
+static PyObject*
+process_group_map(PyObject *self UNUSED, PyObject *args UNUSED) {
+    DIR *d = opendir("/proc");
+    if (!d) return PyErr_SetFromErrnoWithFilename(PyExc_OSError, "/proc");
+    PyObject *ans = PyList_New(0);
+    if (!ans) { closedir(d); return NULL; }
+    char path[64], buf[512];
+    struct dirent *e;
+    while ((e = readdir(d)) != NULL) {
+        // skip the many non pid entries such as self, sys, bus, etc. cheaply
+        if (e->d_name[0] < '0' || e->d_name[0] > '9') continue;
+        char *end;
+        long pid = strtol(e->d_name, &end, 10);
+        if (end == e->d_name || *end) continue;
+        snprintf(path, sizeof(path), "/proc/%ld/stat", pid);
+        int fd = safe_open(path, O_RDONLY | O_CLOEXEC, 0);
+        if (fd < 0) continue;
+        ssize_t n;
+        while ((n = read(fd, buf, sizeof(buf) - 1)) < 0 && errno == EINTR);
+        safe_close(fd, __FILE__, __LINE__);
+        if (n <= 0) continue;
+        buf[n] = 0;
+        // the second field is the command name in parentheses, it can
+        // contain spaces and parentheses, so skip past the last )
+        const char *p = strrchr(buf, ')');
+        long ppid, pgid;
+        if (!p || sscanf(p + 1, " %*c %ld %ld", &ppid, &pgid) != 2) continue;
+        PyObject *t = Py_BuildValue("ll", pid, pgid);
+        if (t == NULL) { Py_DECREF(ans); closedir(d); return NULL; }
+        int ret = PyList_Append(ans, t);
+        Py_DECREF(t);
+        if (ret != 0) { Py_DECREF(ans); closedir(d); return NULL; }
+    }
+    closedir(d);
+    PyObject *t = PyList_AsTuple(ans);
+    Py_DECREF(ans);
+    return t;
+}
 #endif
 
 static PyObject*
@@ -210,6 +250,64 @@ py_getpeereid(PyObject *self UNUSED, PyObject *args) {
 }
 
 
+static PyObject*
+parse_environ_block(PyObject *self UNUSED, PyObject *args) {
+    // Parse a C environ block of environment variables into a dictionary.
+    // The block is usually raw data from the target process. It might contain
+    // trailing garbage and lines that do not look like assignments.
+    const char *data; Py_ssize_t sz;
+    if (!PyArg_ParseTuple(args, "y#", &data, &sz)) return NULL;
+    PyObject *ans = PyDict_New();
+    if (!ans) return NULL;
+    const char *p = data, *end = data + sz;
+    while (p < end) {
+        const char *nul = memchr(p, 0, end - p);
+        // nul byte at the beginning or double nul byte means finish
+        if (!nul || nul == p) break;
+        // there might not be an equals sign
+        const char *eq = memchr(p, '=', nul - p);
+        if (eq && eq > p) {
+            PyObject *key = PyUnicode_DecodeUTF8(p, eq - p, NULL);
+            PyObject *val = key ? PyUnicode_DecodeUTF8(eq + 1, nul - eq - 1, NULL) : NULL;
+            int ret = val ? PyDict_SetItem(ans, key, val) : -1;
+            Py_XDECREF(key); Py_XDECREF(val);
+            if (ret != 0) { Py_DECREF(ans); return NULL; }
+        }
+        p = nul + 1;
+    }
+    return ans;
+}
+
+static PyObject*
+cmdline_split(PyObject *self UNUSED, PyObject *args) {
+    // Split a nul separated command line, such as /proc/pid/cmdline, into a
+    // list of its non-empty entries.
+    const char *data; Py_ssize_t sz;
+    if (!PyArg_ParseTuple(args, "y#", &data, &sz)) return NULL;
+    const char *end = data + sz, *p, *nul;
+    Py_ssize_t count = 0;
+    for (p = data; p < end; p = nul + 1) {
+        nul = memchr(p, 0, end - p);
+        // the last entry might not be nul terminated
+        if (!nul) { count++; break; }
+        if (nul > p) count++;
+    }
+    PyObject *ans = PyList_New(count);
+    if (!ans) return NULL;
+    Py_ssize_t i = 0;
+    for (p = data; p < end; p = nul + 1) {
+        nul = memchr(p, 0, end - p);
+        const char *entry_end = nul ? nul : end;
+        if (entry_end > p) {
+            PyObject *x = PyUnicode_DecodeUTF8(p, entry_end - p, NULL);
+            if (!x) { Py_DECREF(ans); return NULL; }
+            PyList_SET_ITEM(ans, i++, x);
+        }
+        if (!nul) break;
+    }
+    return ans;
+}
+
 
 static PyMethodDef module_methods[] = {
     {"wcwidth", (PyCFunction)wcwidth_wrap, METH_O, ""},
@@ -227,10 +325,12 @@ static PyMethodDef module_methods[] = {
     {"locale_is_valid", (PyCFunction)locale_is_valid, METH_VARARGS, ""},
     {"shm_open", (PyCFunction)py_shm_open, METH_VARARGS, ""},
     {"shm_unlink", (PyCFunction)py_shm_unlink, METH_VARARGS, ""},
+    {"parse_environ_block", (PyCFunction)parse_environ_block, METH_VARARGS, ""},
+    {"cmdline_split", (PyCFunction)cmdline_split, METH_VARARGS, ""},
 #ifdef __APPLE__
     METHODB(user_cache_dir, METH_NOARGS),
-    METHODB(process_group_map, METH_NOARGS),
 #endif
+    METHODB(process_group_map, METH_NOARGS),
 #ifdef WITH_PROFILER
     {"start_profiler", (PyCFunction)start_profiler, METH_VARARGS, ""},
     {"stop_profiler", (PyCFunction)stop_profiler, METH_NOARGS, ""},
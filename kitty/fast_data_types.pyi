@@ -352,6 +352,14 @@ def environ_of_process(pid: int) -> str:
     pass
 
 
+def parse_environ_block(data: bytes) -> Dict[str, str]:
+    pass
+
+
+def cmdline_split(data: bytes) -> List[str]:
+    pass
+
+
 def cmdline_of_process(pid: int) -> List[str]:
     pass
 
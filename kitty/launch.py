@@ -789,6 +789,6 @@ def clone_and_launch(msg: str, window: Window) -> None:
             cmdline = list(window.child.argv)
         if cmdline and cmdline[0] == window.child.final_argv0:
             cmdline[0] = window.child.final_exe
-        if cmdline and cmdline == [window.child.final_exe] + window.child.argv[1:]:
-            cmdline = window.child.unmodified_argv
+        if cmdline and cmdline == [window.child.final_exe] + list(window.child.argv[1:]):
+            cmdline = list(window.child.unmodified_argv)
     launch(get_boss(), c.opts, cmdline, active=window, is_clone_launch=is_clone_launch)
@@ -21,7 +21,7 @@
 from itertools import count
 from typing import (
     IO, TYPE_CHECKING, Any, Callable, Dict, Iterator, List, NoReturn, Optional,
-    Tuple, TypeVar, Union, cast
+    Sequence, Tuple, TypeVar, Union, cast
 )
 
 from kitty.constants import kitty_exe, running_in_kitty
@@ -149,7 +149,7 @@ def reload_kitty_config(self, opts: Optional[Options] = None) -> None:
     def __call__(
         self,
         tty_fd: int,
-        argv: List[str],
+        argv: Sequence[str],
         cwd: str = '',
         env: Optional[Dict[str, str]] = None,
         stdin_data: Optional[Union[str, bytes]] = None,
@@ -160,7 +160,7 @@ def __call__(
             stdin_data = stdin_data.encode()
         if env is None:
             env = dict(os.environ)
-        cmd: Dict[str, Union[int, List[str], str, Dict[str, str]]] = {
+        cmd: Dict[str, Union[int, Sequence[str], str, Dict[str, str]]] = {
             'tty_name': tty_name, 'cwd': cwd or os.getcwd(), 'argv': argv, 'env': env,
         }
         total_size = 0
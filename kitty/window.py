@@ -18,7 +18,7 @@
     Optional, Pattern, Sequence, Tuple, Union
 )
 
-from .child import ProcessDesc
+from .child import ProcessDescDict
 from .cli_stub import CLIOptions
 from .config import build_ansi_color_table
 from .constants import (
@@ -139,7 +139,7 @@ class WindowDict(TypedDict):
     cwd: str
     cmdline: List[str]
     env: Dict[str, str]
-    foreground_processes: List[ProcessDesc]
+    foreground_processes: List[ProcessDescDict]
     is_self: bool
     lines: int
     columns: int
@@ -594,7 +594,7 @@ def as_dict(self, is_focused: bool = False, is_self: bool = False) -> WindowDict
             cwd=self.child.current_cwd or self.child.cwd,
             cmdline=self.child.cmdline,
             env=self.child.environ,
-            foreground_processes=self.child.foreground_processes,
+            foreground_processes=[p.as_dict() for p in self.child.foreground_processes],
             is_self=is_self,
             lines=self.screen.lines,
             columns=self.screen.columns,
@@ -842,7 +842,7 @@ def handle_remote_file(self, netloc: str, remote_path: str) -> None:
         args = self.ssh_kitten_cmdline()
         conn_data: Union[None, List[str], SSHConnectionData] = None
         if args:
-            ssh_cmdline = sorted(self.child.foreground_processes, key=lambda p: p['pid'])[-1]['cmdline'] or ['']
+            ssh_cmdline = sorted(self.child.foreground_processes, key=lambda p: p.pid)[-1].cmdline or ['']
             if 'ControlPath=' in ' '.join(ssh_cmdline):
                 idx = ssh_cmdline.index('--')
                 conn_data = [is_ssh_kitten_sentinel] + list(ssh_cmdline[:idx + 2])
@@ -1348,7 +1348,7 @@ def cwd_of_child(self) -> Optional[str]:
     @property
     def child_is_remote(self) -> bool:
         for p in self.child.foreground_processes:
-            q = list(p['cmdline'] or ())
+            q = list(p.cmdline or ())
             if q and q[0].lower() == 'ssh':
                 return True
         return False
@@ -1356,7 +1356,7 @@ def child_is_remote(self) -> bool:
     def ssh_kitten_cmdline(self) -> List[str]:
         from kittens.ssh.utils import is_kitten_cmdline
         for p in self.child.foreground_processes:
-            q = list(p['cmdline'] or ())
+            q = list(p.cmdline or ())
             if is_kitten_cmdline(q):
                 return q
         return []
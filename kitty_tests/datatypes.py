@@ -532,3 +532,114 @@ def q(x, y=''):
         q('a\x1bbc', 'ac')
         q('a\x1b[bc', 'ac')
         q('a\x1b[12;34:43mbc', 'abc')
+
+    def test_parse_environ_block(self):
+        from kitty.child import parse_environ_block
+        from kitty.fast_data_types import parse_environ_block as c_parse_environ_block
+
+        def q(block, expected):
+            self.ae(parse_environ_block(block), expected)
+            self.ae(c_parse_environ_block(block.encode('utf-8')), expected)
+        q('', {})
+        q('a=1\0b=2=3\0', {'a': '1', 'b': '2=3'})
+        q('a=1\0noeq\0=x\0b=\0', {'a': '1', 'b': ''})
+        q('a=1\0\0b=2\0', {'a': '1'})
+        q('a=1\0b=2', {'a': '1'})
+        q('a=é\0', {'a': 'é'})
+
+    def test_cmdline_split(self):
+        from kitty.fast_data_types import cmdline_split
+        self.ae(cmdline_split(b''), [])
+        self.ae(cmdline_split(b'\0\0'), [])
+        self.ae(cmdline_split(b'a\0bc\0'), ['a', 'bc'])
+        self.ae(cmdline_split(b'a\0\0b\0\0\0'), ['a', 'b'])
+        self.ae(cmdline_split(b'a\0b'), ['a', 'b'])
+
+    def test_process_group_map(self):
+        from kitty.fast_data_types import process_group_map
+        self.assertIn((os.getpid(), os.getpgrp()), process_group_map())
+        if os.path.exists('/proc/self/comm'):
+            # a command name containing spaces and parentheses must not shift the stat fields
+            import subprocess
+
+            from kitty.constants import kitty_exe
+            p = subprocess.Popen([kitty_exe(), '+runpy', 'import os, sys\n'
+                'os.setpgid(0, 0)\n'
+                'open("/proc/self/comm", "w").write("a) b (c")\n'
+                'print(flush=True); sys.stdin.read()'], stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+            try:
+                self.ae(p.stdout.readline(), b'\n')
+                self.assertIn((p.pid, p.pid), process_group_map())
+            finally:
+                p.communicate()
+
+    def test_processes_in_group_cache(self):
+        from collections import defaultdict
+
+        import kitty.child as c
+        calls = []
+
+        def process_group_map():
+            calls.append(1)
+            ans = defaultdict(list)
+            ans[1].extend((1, 2))
+            if len(calls) > 1:
+                ans[3].append(3)
+            return ans
+
+        orig, orig_ttl = c.process_group_map, c.PROCESS_GROUP_MAP_TTL
+        c.process_group_map = process_group_map
+        # avoid spurious failures if the test runs slowly
+        c.PROCESS_GROUP_MAP_TTL = 1000
+        c.invalidate_process_group_map()
+        try:
+            self.ae(c.processes_in_group(1), [1, 2])
+            self.ae(len(calls), 1)
+            self.ae(c.processes_in_group(1), [1, 2])
+            self.ae(len(calls), 1)
+            # a group missing from the cached map causes a rescan
+            self.ae(c.processes_in_group(3), [3])
+            self.ae(len(calls), 2)
+            self.ae(c.processes_in_group(3), [3])
+            self.ae(len(calls), 2)
+            c.invalidate_process_group_map()
+            self.ae(c.processes_in_group(1), [1, 2])
+            self.ae(len(calls), 3)
+        finally:
+            c.process_group_map, c.PROCESS_GROUP_MAP_TTL = orig, orig_ttl
+            c.invalidate_process_group_map()
+
+    def test_process_desc(self):
+        import kitty.child as c
+        reads = []
+
+        class Child:
+            def cmdline_of_pid(self, pid):
+                reads.append('cmdline')
+                return ['cmd', str(pid)]
+
+        orig = c._cwd_of_process
+
+        def cwd_of_process(pid):
+            reads.append('cwd')
+            return f'/cwd/{pid}'
+
+        c._cwd_of_process = cwd_of_process
+        try:
+            p = c.ProcessDesc(7, Child())
+            self.ae(repr(p), 'ProcessDesc(pid=7)')
+            self.ae(reads, [])
+            self.ae(p['cmdline'], ['cmd', '7'])
+            self.ae(p.cmdline, ['cmd', '7'])
+            self.ae(reads, ['cmdline'])
+            self.ae(repr(p), "ProcessDesc(pid=7, cmdline=['cmd', '7'])")
+            self.ae(p.get('cwd'), '/cwd/7')
+            self.ae(p.cwd, '/cwd/7')
+            self.ae(reads, ['cmdline', 'cwd'])
+            self.ae(p['pid'], 7)
+            self.ae(p.get('missing', 'x'), 'x')
+            self.assertRaises(KeyError, lambda: p['missing'])
+            self.ae(p.as_dict(), {'pid': 7, 'cmdline': ['cmd', '7'], 'cwd': '/cwd/7'})
+            self.ae(reads, ['cmdline', 'cwd'])
+        finally:
+            c._cwd_of_process = orig